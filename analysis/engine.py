@@ -1,222 +1,225 @@
 """
 Analysis engine — computes derived metrics, quartile positioning, and normalized scores.
 """
-from data.benchmarks import get_benchmarks, METRIC_ORDER
-
-
-def compute_derived_metrics(client_data: dict) -> dict:
+import math
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+from data.benchmarks import get_ordered_benchmarks, BENCHMARK_ARRAYS, METRIC_INDEX, METRIC_ORDER
+
+# Quartile labels, indexed by the codes returned from score_metrics()
+QUARTILES = ("top_quartile", "above_median", "below_median", "bottom_quartile")
+
+# (quartile code, direction sign) -> insight field. Top and above-median positions
+# get the "high" insight for higher_is_better metrics and the "low" one otherwise.
+_INSIGHT_KEYS = {
+    (0, 1): "insight_high", (1, 1): "insight_high",
+    (2, 1): "insight_low", (3, 1): "insight_low",
+    (0, -1): "insight_low", (1, -1): "insight_low",
+    (2, -1): "insight_high", (3, -1): "insight_high",
+}
+
+
+# Numeric client inputs read by compute_derived_metrics (missing -> 0), in unpack order
+_AMOUNT_KEYS = (
+    "revenue",
+    "total_employees",
+    "it_budget",
+    "it_budget_prior_year",
+    "it_ftes",
+    "total_opex",
+    "cloud_spend",
+    "cybersecurity_spend",
+    "it_labor_cost",
+    "outsourcing_spend",
+    "application_spend",
+    "infrastructure_spend",
+)
+
+# Metrics taken straight from client inputs: (metric_id, input key)
+_DIRECT_INPUTS = (
+    ("run_budget_pct", "run_pct"),
+    ("grow_budget_pct", "grow_pct"),
+    ("transform_budget_pct", "transform_pct"),
+    ("system_availability", "system_availability"),
+    ("it_attrition_rate", "it_attrition_rate"),
+    ("helpdesk_cost_per_ticket", "helpdesk_cost_per_ticket"),
+)
+
+
+def compute_derived_metrics(client_data: dict) -> np.ndarray:
     """
     Takes raw client inputs and computes all benchmark-comparable metrics.
-    Returns a dict keyed by metric_id -> computed value.
+    Returns a float array aligned with METRIC_ORDER; NaN where a metric can't be computed.
     """
-    results = {}
-    revenue = client_data.get("revenue", 0)
-    total_employees = client_data.get("total_employees", 0)
-    it_budget = client_data.get("it_budget", 0)
-    it_budget_prior = client_data.get("it_budget_prior_year", 0)
-    it_ftes = client_data.get("it_ftes", 0)
-    total_opex = client_data.get("total_opex", 0)
+    results = np.full(len(METRIC_ORDER), np.nan)
+    idx = METRIC_INDEX
+    get = client_data.get
+    (
+        revenue, total_employees, it_budget, it_budget_prior, it_ftes, total_opex,
+        cloud_spend, cyber_spend, labor_cost, outsourcing_spend, app_spend, infra_spend,
+    ) = [get(k, 0) for k in _AMOUNT_KEYS]
 
     # Spend metrics
     if revenue > 0:
-        results["it_spend_pct_revenue"] = (it_budget / revenue) * 100
+        results[idx["it_spend_pct_revenue"]] = (it_budget / revenue) * 100
 
     if total_employees > 0:
-        results["it_spend_per_employee"] = it_budget / total_employees
+        results[idx["it_spend_per_employee"]] = it_budget / total_employees
 
     if total_opex > 0:
-        results["it_spend_pct_opex"] = (it_budget / total_opex) * 100
+        results[idx["it_spend_pct_opex"]] = (it_budget / total_opex) * 100
 
     if it_budget_prior > 0:
-        results["it_budget_yoy_growth"] = (
+        results[idx["it_budget_yoy_growth"]] = (
             (it_budget - it_budget_prior) / it_budget_prior
         ) * 100
 
     # Staffing metrics
     if total_employees > 0:
-        results["it_staff_pct_employees"] = (it_ftes / total_employees) * 100
+        results[idx["it_staff_pct_employees"]] = (it_ftes / total_employees) * 100
 
     if it_ftes > 0:
-        results["it_staffing_ratio"] = total_employees / it_ftes
-
-    # Budget allocation (Run / Grow / Transform)
-    results["run_budget_pct"] = client_data.get("run_pct", None)
-    results["grow_budget_pct"] = client_data.get("grow_pct", None)
-    results["transform_budget_pct"] = client_data.get("transform_pct", None)
-
-    # Technology mix
-    if it_budget > 0:
-        cloud_spend = client_data.get("cloud_spend", 0)
-        results["cloud_pct_budget"] = (cloud_spend / it_budget) * 100
-
-        cyber_spend = client_data.get("cybersecurity_spend", 0)
-        results["cybersecurity_pct_budget"] = (cyber_spend / it_budget) * 100
+        results[idx["it_staffing_ratio"]] = total_employees / it_ftes
 
-    # Cost structure
     if it_budget > 0:
-        labor_cost = client_data.get("it_labor_cost", 0)
-        results["it_labor_pct_budget"] = (labor_cost / it_budget) * 100
+        # Technology mix
+        results[idx["cloud_pct_budget"]] = (cloud_spend / it_budget) * 100
+        results[idx["cybersecurity_pct_budget"]] = (cyber_spend / it_budget) * 100
 
-        outsourcing_spend = client_data.get("outsourcing_spend", 0)
-        results["outsourcing_pct_budget"] = (outsourcing_spend / it_budget) * 100
+        # Cost structure
+        results[idx["it_labor_pct_budget"]] = (labor_cost / it_budget) * 100
+        results[idx["outsourcing_pct_budget"]] = (outsourcing_spend / it_budget) * 100
 
-        app_spend = client_data.get("application_spend", 0)
-        infra_spend = client_data.get("infrastructure_spend", 0)
         total_app_infra = app_spend + infra_spend
         if total_app_infra > 0:
-            results["app_pct_budget"] = (app_spend / total_app_infra) * 100
+            results[idx["app_pct_budget"]] = (app_spend / total_app_infra) * 100
 
-    # Operational metrics (direct inputs)
-    results["system_availability"] = client_data.get("system_availability", None)
-    results["it_attrition_rate"] = client_data.get("it_attrition_rate", None)
-    results["helpdesk_cost_per_ticket"] = client_data.get(
-        "helpdesk_cost_per_ticket", None
-    )
+    # Budget allocation (Run / Grow / Transform) and operational metrics;
+    # unanswered inputs are skipped and stay NaN
+    for metric_id, key in _DIRECT_INPUTS:
+        value = get(key)
+        if value is not None:
+            results[idx[metric_id]] = value
 
-    # Strip None values
-    return {k: v for k, v in results.items() if v is not None}
+    return results
 
 
-def get_quartile_position(bench: dict, value: float) -> str:
+def score_metrics(values: np.ndarray, arrays: dict) -> tuple[np.ndarray, np.ndarray]:
     """
-    Determine which quartile the client falls in for a given metric.
-    Returns one of: 'top_quartile', 'above_median', 'below_median', 'bottom_quartile'
+    Vectorized quartile positioning and 0-100 scoring over the aligned benchmark arrays.
+    Scores are 100 at or beyond the top quartile, 50 at the median and 0 at or beyond
+    the bottom quartile, linear in between. lower_is_better metrics are sign-flipped
+    so a single higher-is-better formula covers both directions.
+    `values` may be 1-D (one client) or 2-D (scenarios x metrics); thresholds broadcast.
+    Returns (quartile codes indexing QUARTILES, scores).
     """
-    tq = bench["top_quartile"]
-    med = bench["median"]
-    bq = bench["bottom_quartile"]
-    direction = bench["direction"]
-
-    if direction == "lower_is_better":
-        if value <= tq:
-            return "top_quartile"
-        elif value <= med:
-            return "above_median"
-        elif value <= bq:
-            return "below_median"
-        else:
-            return "bottom_quartile"
-    else:
-        if value >= tq:
-            return "top_quartile"
-        elif value >= med:
-            return "above_median"
-        elif value >= bq:
-            return "below_median"
-        else:
-            return "bottom_quartile"
-
-
-def normalize_score(bench: dict, value: float) -> float:
+    sign = arrays["dir"]
+    v = sign * values
+    tq = sign * arrays["tq"]
+    med = sign * arrays["med"]
+    bq = sign * arrays["bq"]
+
+    quartile_idx = np.select([v >= tq, v >= med, v >= bq], [0, 1, 2], default=3)
+
+    upper_range = tq - med
+    lower_range = med - bq
+    with np.errstate(divide="ignore", invalid="ignore"):
+        upper = np.where(upper_range == 0, 75.0, 50.0 + 50.0 * (v - med) / upper_range)
+        lower = np.where(lower_range == 0, 25.0, 50.0 * (v - bq) / lower_range)
+    scores = np.select([v >= tq, v <= bq, v >= med], [100.0, 0.0, upper], default=lower)
+
+    return quartile_idx, scores
+
+
+def score_scenarios(scenarios: list[dict], industry: str = "financial_services") -> np.ndarray:
     """
-    Normalize a metric value to a 0-100 scale where:
-    - 100 = at or beyond top quartile (best)
-    - 50 = at median
-    - 0 = at or beyond bottom quartile (worst)
+    Score many what-if variants of the client inputs in one vectorized call.
+    Returns an (n_scenarios, n_metrics) array of 0-100 scores with columns in
+    get_ordered_benchmarks(industry) order; NaN where a metric can't be computed.
     """
-    tq = bench["top_quartile"]
-    med = bench["median"]
-    bq = bench["bottom_quartile"]
-    direction = bench["direction"]
-
-    if direction == "lower_is_better":
-        if value <= tq:
-            return 100.0
-        elif value >= bq:
-            return 0.0
-        elif value <= med:
-            range_val = med - tq
-            if range_val == 0:
-                return 75.0
-            return 50.0 + 50.0 * (med - value) / range_val
-        else:
-            range_val = bq - med
-            if range_val == 0:
-                return 25.0
-            return 50.0 * (bq - value) / range_val
-    else:
-        if value >= tq:
-            return 100.0
-        elif value <= bq:
-            return 0.0
-        elif value >= med:
-            range_val = tq - med
-            if range_val == 0:
-                return 75.0
-            return 50.0 + 50.0 * (value - med) / range_val
-        else:
-            range_val = med - bq
-            if range_val == 0:
-                return 25.0
-            return 50.0 * (value - bq) / range_val
-
-
-def get_insight(bench: dict, quartile: str) -> str:
-    """Return contextual insight text based on quartile position."""
-    if quartile in ("top_quartile", "above_median"):
-        direction = bench["direction"]
-        if direction == "lower_is_better":
-            return bench["insight_low"]
-        else:
-            return bench["insight_high"]
-    elif quartile in ("bottom_quartile", "below_median"):
-        direction = bench["direction"]
-        if direction == "lower_is_better":
-            return bench["insight_high"]
-        else:
-            return bench["insight_low"]
-    return bench["insight_aligned"]
-
-
-def get_delta_vs_median(bench: dict, value: float) -> dict:
-    """Calculate the delta between client value and median."""
-    med = bench["median"]
-    delta = value - med
-    if med != 0:
-        delta_pct = (delta / med) * 100
-    else:
-        delta_pct = 0
-    return {"delta": delta, "delta_pct": delta_pct}
+    ordered = get_ordered_benchmarks(industry)
+    if not ordered:
+        return np.empty((len(scenarios), 0))
+
+    arrays = BENCHMARK_ARRAYS[industry]
+    derived = np.array([compute_derived_metrics(c) for c in scenarios]).reshape(len(scenarios), len(METRIC_ORDER))
+    values = derived[:, arrays["pos"]]
+    _, scores = score_metrics(values, arrays)
+    return np.where(np.isnan(values), np.nan, scores)
 
 
 def run_full_analysis(client_data: dict, industry: str = "financial_services") -> list[dict]:
     """
     Run the complete analysis pipeline. Returns a list of result dicts,
     one per metric, in display order.
+
+    Results are memoized on the full contents of client_data, so Streamlit
+    reruns with unchanged inputs skip the pipeline. Inputs holding unhashable
+    values are computed without the cache. Treat the dicts as read-only.
     """
-    benchmarks = get_benchmarks(industry)
-    derived = compute_derived_metrics(client_data)
-    results = []
+    key = tuple(sorted(client_data.items()))
+    try:
+        hash(key)
+    except TypeError:
+        return _run_full_analysis(client_data, industry)
+    return list(_run_full_analysis_cached(industry, key))
+
+
+@lru_cache(maxsize=32)
+def _run_full_analysis_cached(industry: str, client_items: tuple) -> tuple[dict, ...]:
+    return tuple(_run_full_analysis(dict(client_items), industry))
 
-    for metric_id in METRIC_ORDER:
-        if metric_id not in derived or metric_id not in benchmarks:
-            continue
 
-        bench = benchmarks[metric_id]
-        value = derived[metric_id]
-        quartile = get_quartile_position(bench, value)
-        score = normalize_score(bench, value)
-        delta = get_delta_vs_median(bench, value)
-        insight = get_insight(bench, quartile)
+def _run_full_analysis(client_data: dict, industry: str) -> list[dict]:
+    ordered = get_ordered_benchmarks(industry)
+    if not ordered:
+        return []
+
+    arrays = BENCHMARK_ARRAYS[industry]
+    values = compute_derived_metrics(client_data)[arrays["pos"]]
+
+    # Quartile, score and delta for every metric in one vectorized pass
+    quartile_idx, scores = score_metrics(values, arrays)
+    med = arrays["med"]
+    deltas = values - med
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta_pcts = np.where(med != 0, (deltas / med) * 100, 0.0)
+
+    results = []
+    for (metric_id, bench), value, q, sign, score, delta, delta_pct in zip(
+        ordered,
+        values.tolist(),
+        quartile_idx.tolist(),
+        arrays["dir"].tolist(),
+        scores.tolist(),
+        deltas.tolist(),
+        delta_pcts.tolist(),
+    ):
+        if math.isnan(value):  # metric not computable from the inputs
+            continue
 
         results.append(
             {
                 "metric_id": metric_id,
-                "name": bench["name"],
-                "category": bench["category"],
-                "unit": bench["unit"],
-                "format": bench["format"],
+                "name": bench.name,
+                "category": bench.category,
+                "unit": bench.unit,
+                "format": bench.format,
                 "value": value,
-                "top_quartile": bench["top_quartile"],
-                "median": bench["median"],
-                "bottom_quartile": bench["bottom_quartile"],
-                "direction": bench["direction"],
-                "quartile": quartile,
+                "top_quartile": bench.top_quartile,
+                "median": bench.median,
+                "bottom_quartile": bench.bottom_quartile,
+                "direction": bench.direction,
+                "bands_reversed": sign > 0,  # chart bands run red -> green
+                "quartile": QUARTILES[q],
                 "score": score,
-                "delta": delta["delta"],
-                "delta_pct": delta["delta_pct"],
-                "insight": insight,
-                "source": bench["source"],
+                "delta": delta,
+                "delta_pct": delta_pct,
+                "insight": getattr(bench, _INSIGHT_KEYS[q, sign]),
+                "source": bench.source,
             }
         )
 
@@ -229,17 +232,17 @@ def get_summary_stats(results: list[dict]) -> dict:
     if total == 0:
         return {"total": 0, "top_q": 0, "above_med": 0, "below_med": 0, "bottom_q": 0, "avg_score": 0}
 
-    top_q = sum(1 for r in results if r["quartile"] == "top_quartile")
-    above_med = sum(1 for r in results if r["quartile"] == "above_median")
-    below_med = sum(1 for r in results if r["quartile"] == "below_median")
-    bottom_q = sum(1 for r in results if r["quartile"] == "bottom_quartile")
-    avg_score = sum(r["score"] for r in results) / total
+    counts = Counter()
+    total_score = 0.0
+    for r in results:
+        counts[r["quartile"]] += 1
+        total_score += r["score"]
 
     return {
         "total": total,
-        "top_q": top_q,
-        "above_med": above_med,
-        "below_med": below_med,
-        "bottom_q": bottom_q,
-        "avg_score": avg_score,
+        "top_q": counts["top_quartile"],
+        "above_med": counts["above_median"],
+        "below_med": counts["below_median"],
+        "bottom_q": counts["bottom_quartile"],
+        "avg_score": total_score / total,
     }
@@ -32,7 +32,7 @@ with st.sidebar:
         if industry_name:
             st.markdown(f"**Industry:** {industry_name}")
         if st.button("Clear Data", use_container_width=True):
-            for key in ["client_data", "analysis_run", "analysis_results"]:
+            for key in ["client_data", "analysis_run"]:
                 st.session_state.pop(key, None)
             st.rerun()
     else:
@@ -1,7 +1,12 @@
 """
 Chart builders using Plotly — radar, horizontal bar, and gauge charts.
 """
-import plotly.graph_objects as go
+from typing import TYPE_CHECKING
+
+import streamlit as st
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 # Consistent color scheme
 COLORS = {
@@ -23,12 +28,98 @@ QUARTILE_LABELS = {
     "bottom_quartile": "Bottom Quartile",
 }
 
+# Quartile band fills for the single-metric bar chart, left to right
+_BAND_COLORS_HIGH = ("rgba(239,68,68,0.15)", "rgba(251,191,36,0.15)", "rgba(34,197,94,0.15)")
+_BAND_COLORS_LOW = _BAND_COLORS_HIGH[::-1]
+
+
+# ── Figure caching ─────────────────────────────────────────────────
+# Only the per-metric bar chart is cached: it is slow to build (shapes and annotations
+# per band), while a cache hit unpickles a copy of the figure, which costs more than
+# building the radar or gauge outright and about the same as the category bar chart.
+def _result_key(result: dict) -> tuple:
+    # Thresholds are part of the key: the same metric differs across industries
+    return (
+        result["metric_id"],
+        result["value"],
+        result["quartile"],
+        result["top_quartile"],
+        result["median"],
+        result["bottom_quartile"],
+    )
+
+
+_cache_result_chart = st.cache_data(show_spinner=False, max_entries=64, hash_funcs={dict: _result_key})
 
-def create_radar_chart(results: list[dict], max_metrics: int = 12) -> go.Figure:
+# ── Layout templates ───────────────────────────────────────────────
+# Static layout skeletons, built once at import and shared by every figure.
+_RADAR_LAYOUT = dict(
+    polar=dict(
+        radialaxis=dict(
+            visible=True,
+            range=[0, 105],
+            tickvals=[0, 25, 50, 75, 100],
+            ticktext=["0", "25", "50", "75", "100"],
+            gridcolor="#e2e8f0",
+        ),
+        angularaxis=dict(gridcolor="#e2e8f0"),
+        bgcolor="white",
+    ),
+    showlegend=True,
+    legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5),
+    title=dict(
+        text="IT Benchmarking Scorecard",
+        x=0.5,
+        font=dict(size=18),
+    ),
+    height=550,
+    margin=dict(t=80, b=80, l=80, r=80),
+)
+
+_METRIC_BAR_LAYOUT = dict(
+    yaxis=dict(visible=False, range=[0, 1]),
+    height=120,
+    margin=dict(t=30, b=30, l=10, r=10),
+    plot_bgcolor="white",
+)
+
+_GAUGE_STYLE = dict(
+    axis=dict(range=[0, 100], tickwidth=2),
+    bar=dict(color=COLORS["client"], thickness=0.75),
+    steps=[
+        dict(range=[0, 25], color="rgba(239,68,68,0.2)"),
+        dict(range=[25, 50], color="rgba(251,191,36,0.2)"),
+        dict(range=[50, 75], color="rgba(134,239,172,0.2)"),
+        dict(range=[75, 100], color="rgba(34,197,94,0.2)"),
+    ],
+    threshold=dict(
+        line=dict(color="#6b7280", width=3),
+        thickness=0.8,
+        value=50,
+    ),
+)
+
+_GAUGE_LAYOUT = dict(
+    height=250,
+    margin=dict(t=50, b=10, l=30, r=30),
+)
+
+_CATEGORY_BAR_LAYOUT = dict(
+    xaxis=dict(title="Benchmark Score (0-100)", range=[0, 105]),
+    yaxis=dict(automargin=True, autorange="reversed"),  # first metric on top
+    margin=dict(t=30, b=40, l=10, r=10),
+    plot_bgcolor="white",
+    title=dict(text="Metric-by-Metric Benchmark Positioning", x=0.5, font=dict(size=16)),
+)
+
+
+def create_radar_chart(results: list[dict], max_metrics: int = 12) -> "go.Figure":
     """
     Create a radar/spider chart showing client scores vs median and top quartile.
     Scores are normalized 0-100.
     """
+    import plotly.graph_objects as go
+
     # Use up to max_metrics for readability
     data = results[:max_metrics]
     if not data:
@@ -43,10 +134,8 @@ def create_radar_chart(results: list[dict], max_metrics: int = 12) -> go.Figure:
     median_closed = [50] * len(categories) + [50]  # median is always 50 on normalized scale
     top_q_closed = [100] * len(categories) + [100]
 
-    fig = go.Figure()
-
-    # Top quartile reference (outer boundary)
-    fig.add_trace(
+    traces = [
+        # Top quartile reference (outer boundary)
         go.Scatterpolar(
             r=top_q_closed,
             theta=categories_closed,
@@ -54,22 +143,16 @@ def create_radar_chart(results: list[dict], max_metrics: int = 12) -> go.Figure:
             line=dict(color=COLORS["top_q_line"], width=1, dash="dot"),
             fill=None,
             opacity=0.5,
-        )
-    )
-
-    # Median reference
-    fig.add_trace(
+        ),
+        # Median reference
         go.Scatterpolar(
             r=median_closed,
             theta=categories_closed,
             name="Industry Median",
             line=dict(color=COLORS["median_line"], width=2, dash="dash"),
             fill=None,
-        )
-    )
-
-    # Client data
-    fig.add_trace(
+        ),
+        # Client data
         go.Scatterpolar(
             r=client_closed,
             theta=categories_closed,
@@ -77,81 +160,54 @@ def create_radar_chart(results: list[dict], max_metrics: int = 12) -> go.Figure:
             line=dict(color=COLORS["client"], width=3),
             fill="toself",
             fillcolor="rgba(59, 130, 246, 0.15)",
-        )
-    )
-
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 105],
-                tickvals=[0, 25, 50, 75, 100],
-                ticktext=["0", "25", "50", "75", "100"],
-                gridcolor="#e2e8f0",
-            ),
-            angularaxis=dict(gridcolor="#e2e8f0"),
-            bgcolor="white",
-        ),
-        showlegend=True,
-        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5),
-        title=dict(
-            text="IT Benchmarking Scorecard",
-            x=0.5,
-            font=dict(size=18),
         ),
-        height=550,
-        margin=dict(t=80, b=80, l=80, r=80),
-    )
+    ]
+
+    fig = go.Figure(data=traces, layout=_RADAR_LAYOUT)
 
     return fig
 
 
-def create_metric_bar_chart(result: dict) -> go.Figure:
+@_cache_result_chart
+def create_metric_bar_chart(result: dict) -> "go.Figure":
     """
     Create a horizontal bar chart for a single metric showing the client value
     positioned against benchmark quartile ranges.
     """
+    import plotly.graph_objects as go
+
     bench_tq = result["top_quartile"]
     bench_med = result["median"]
     bench_bq = result["bottom_quartile"]
     client_val = result["value"]
-    direction = result["direction"]
     name = result["name"]
     unit = result["unit"]
     fmt = result["format"]
 
-    # Determine the range for the chart
+    # Determine the range for the chart (same for both directions;
+    # the band colours show which side is better)
     all_vals = [bench_tq, bench_med, bench_bq, client_val]
-    min_val = min(all_vals) * 0.8
-    max_val = max(all_vals) * 1.2
-
-    if direction == "lower_is_better":
-        # Left is better: TQ < Median < BQ
-        range_start = min_val
-        range_end = max_val
-    else:
-        # Right is better: BQ < Median < TQ
-        range_start = min_val
-        range_end = max_val
+    range_start = min(all_vals) * 0.8
+    range_end = max(all_vals) * 1.2
 
     color = COLORS[result["quartile"]]
 
-    fig = go.Figure()
+    fig = go.Figure(layout=_METRIC_BAR_LAYOUT)
 
-    # Background quartile bands
-    sorted_benchmarks = sorted([bench_tq, bench_med, bench_bq])
-    band_colors = ["rgba(34,197,94,0.15)", "rgba(251,191,36,0.15)", "rgba(239,68,68,0.15)"]
-    if direction == "higher_is_better":
-        band_colors = list(reversed(band_colors))
+    # Background quartile bands (benchmarks ordered low to high without a sort)
+    lo = min(bench_tq, bench_med, bench_bq)
+    hi = max(bench_tq, bench_med, bench_bq)
+    mid = max(min(bench_tq, bench_med), min(max(bench_tq, bench_med), bench_bq))
+    band_colors = _BAND_COLORS_HIGH if result["bands_reversed"] else _BAND_COLORS_LOW
 
     # Band 1: min to first benchmark
-    fig.add_vrect(x0=range_start, x1=sorted_benchmarks[0], fillcolor=band_colors[0], layer="below", line_width=0)
+    fig.add_vrect(x0=range_start, x1=lo, fillcolor=band_colors[0], layer="below", line_width=0)
     # Band 2: first to second benchmark
-    fig.add_vrect(x0=sorted_benchmarks[0], x1=sorted_benchmarks[1], fillcolor=band_colors[1], layer="below", line_width=0)
+    fig.add_vrect(x0=lo, x1=mid, fillcolor=band_colors[1], layer="below", line_width=0)
     # Band 3: second to third benchmark
-    fig.add_vrect(x0=sorted_benchmarks[1], x1=sorted_benchmarks[2], fillcolor=band_colors[1], layer="below", line_width=0)
+    fig.add_vrect(x0=mid, x1=hi, fillcolor=band_colors[1], layer="below", line_width=0)
     # Band 4: third benchmark to max
-    fig.add_vrect(x0=sorted_benchmarks[2], x1=range_end, fillcolor=band_colors[2], layer="below", line_width=0)
+    fig.add_vrect(x0=hi, x1=range_end, fillcolor=band_colors[2], layer="below", line_width=0)
 
     # Benchmark reference lines
     for val, label, dash in [
@@ -193,64 +249,44 @@ def create_metric_bar_chart(result: dict) -> go.Figure:
 
     fig.update_layout(
         xaxis=dict(range=[range_start, range_end], title=f"{unit}" if unit != "ratio" else "Users per IT FTE"),
-        yaxis=dict(visible=False, range=[0, 1]),
-        height=120,
-        margin=dict(t=30, b=30, l=10, r=10),
-        plot_bgcolor="white",
     )
 
     return fig
 
 
-def create_summary_gauge(avg_score: float) -> go.Figure:
+def create_summary_gauge(avg_score: float) -> "go.Figure":
     """Create a gauge chart showing the overall benchmark score."""
+    import plotly.graph_objects as go
+
     fig = go.Figure(
         go.Indicator(
             mode="gauge+number",
             value=avg_score,
             number=dict(suffix="/100", font=dict(size=36)),
-            gauge=dict(
-                axis=dict(range=[0, 100], tickwidth=2),
-                bar=dict(color=COLORS["client"], thickness=0.75),
-                steps=[
-                    dict(range=[0, 25], color="rgba(239,68,68,0.2)"),
-                    dict(range=[25, 50], color="rgba(251,191,36,0.2)"),
-                    dict(range=[50, 75], color="rgba(134,239,172,0.2)"),
-                    dict(range=[75, 100], color="rgba(34,197,94,0.2)"),
-                ],
-                threshold=dict(
-                    line=dict(color="#6b7280", width=3),
-                    thickness=0.8,
-                    value=50,
-                ),
-            ),
+            gauge=_GAUGE_STYLE,
             title=dict(text="Overall Benchmark Score", font=dict(size=16)),
-        )
-    )
-
-    fig.update_layout(
-        height=250,
-        margin=dict(t=50, b=10, l=30, r=30),
+        ),
+        layout=_GAUGE_LAYOUT,
     )
 
     return fig
 
 
-def create_category_bar_chart(results: list[dict]) -> go.Figure:
+def create_category_bar_chart(results: list[dict]) -> "go.Figure":
     """
     Create a horizontal bar chart showing all metrics with color-coded quartile positioning.
     """
+    import plotly.graph_objects as go
+
     if not results:
         return go.Figure()
 
-    names = [r["name"] for r in reversed(results)]
-    scores = [r["score"] for r in reversed(results)]
-    colors = [COLORS[r["quartile"]] for r in reversed(results)]
-    quartile_labels = [QUARTILE_LABELS[r["quartile"]] for r in reversed(results)]
+    names = [r["name"] for r in results]
+    scores = [r["score"] for r in results]
+    colors = [COLORS[r["quartile"]] for r in results]
+    quartile_labels = [QUARTILE_LABELS[r["quartile"]] for r in results]
 
-    fig = go.Figure()
-
-    fig.add_trace(
+    fig = go.Figure(
         go.Bar(
             y=names,
             x=scores,
@@ -260,7 +296,8 @@ def create_category_bar_chart(results: list[dict]) -> go.Figure:
             textposition="auto",
             textfont=dict(color="white", size=11),
             hovertemplate="%{y}<br>Score: %{x:.0f}/100<br>%{text}<extra></extra>",
-        )
+        ),
+        layout=_CATEGORY_BAR_LAYOUT | {"height": max(400, len(results) * 40)},
     )
 
     # Median reference line
@@ -270,13 +307,4 @@ def create_category_bar_chart(results: list[dict]) -> go.Figure:
         annotation=dict(text="Median", showarrow=False, yshift=-15, font=dict(size=10)),
     )
 
-    fig.update_layout(
-        xaxis=dict(title="Benchmark Score (0-100)", range=[0, 105]),
-        yaxis=dict(automargin=True),
-        height=max(400, len(results) * 40),
-        margin=dict(t=30, b=40, l=10, r=10),
-        plot_bgcolor="white",
-        title=dict(text="Metric-by-Metric Benchmark Positioning", x=0.5, font=dict(size=16)),
-    )
-
     return fig
@@ -5,6 +5,12 @@ Sources: Gartner ITKMD, Avasant/Computer Economics, APQC, McKinsey, IANS Researc
          Deloitte CIO Survey, Arthur D. Little, Flexera, ISG, Forrester
 All figures represent 2024 baseline data.
 """
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable
+
+import numpy as np
 
 # ── Available Industries ───────────────────────────────────────────
 INDUSTRIES = {
@@ -50,6 +56,15 @@ INDUSTRIES = {
     },
 }
 
+# Industry selector tables, built once at import (page scripts are re-executed every rerun)
+INDUSTRY_KEYS = tuple(INDUSTRIES)
+INDUSTRY_NAMES = tuple(INDUSTRIES[k]["name"] for k in INDUSTRY_KEYS)
+INDUSTRY_NAME_TO_KEY = dict(zip(INDUSTRY_NAMES, INDUSTRY_KEYS))
+INDUSTRY_KEY_TO_INDEX = {k: i for i, k in enumerate(INDUSTRY_KEYS)}
+SUB_VERTICALS = {k: INDUSTRIES[k]["sub_verticals"] for k in INDUSTRY_KEYS}
+SUPPORTED_INDUSTRIES = frozenset(INDUSTRY_KEYS)
+SUPPORTED_INDUSTRIES_MD = ", ".join(f"**{n}**" for n in sorted(INDUSTRY_NAMES))
+
 # ── Metric Definitions (shared across industries) ──────────────────
 METRIC_DEFINITIONS = {
     "it_spend_pct_revenue": {
@@ -1446,22 +1461,75 @@ INDUSTRY_BENCHMARKS = {
 }
 
 
-def get_benchmarks(industry: str) -> dict:
+def _make_formatter(unit: str, fmt: str) -> Callable[[float], str]:
+    """Compile a metric's unit and format spec into a display formatter."""
+    if unit == "$":
+        return ("${:" + fmt + "}").format
+    if unit == "%":
+        return ("{:" + fmt + "}%").format
+    if unit == "ratio":
+        return "1:{:.0f}".format
+    return ("{:" + fmt + "}").format
+
+
+# metric_id -> formatter for displaying that metric's values
+FORMATTERS = {
+    metric_id: _make_formatter(definition["unit"], definition["format"])
+    for metric_id, definition in METRIC_DEFINITIONS.items()
+}
+
+# (divisor, format) for plain dollars, millions and billions
+_DOLLAR_SCALES = ((1, "${:,.0f}"), (1_000_000, "${:,.0f}M"), (1_000_000_000, "${:,.1f}B"))
+
+
+@lru_cache(maxsize=256)
+def format_dollars(val: float | None) -> str:
+    """Format a large dollar amount (e.g. SEC-reported revenue) for display."""
+    if val is None:
+        return "N/A"
+    divisor, fmt = _DOLLAR_SCALES[(val >= 1_000_000) + (val >= 1_000_000_000)]
+    return fmt.format(val / divisor)
+
+
+@dataclass(slots=True, frozen=True)
+class MetricSpec:
+    """A metric definition merged with one industry's benchmark values."""
+    name: str
+    category: str
+    unit: str
+    format: str
+    direction: str
+    description: str
+    top_quartile: float
+    median: float
+    bottom_quartile: float
+    insight_high: str
+    insight_low: str
+    insight_aligned: str
+    source: str
+
+
+def _build_benchmarks(industry: str) -> dict[str, MetricSpec]:
     """
-    Build the full benchmark dict for a given industry by merging
+    Build the full benchmark table for a given industry by merging
     metric definitions with industry-specific values.
     """
     industry_data = INDUSTRY_BENCHMARKS.get(industry, {})
     result = {}
     for metric_id, definition in METRIC_DEFINITIONS.items():
         if metric_id in industry_data:
-            merged = {**definition, **industry_data[metric_id]}
-            result[metric_id] = merged
+            result[metric_id] = MetricSpec(**definition, **industry_data[metric_id])
     return result
 
 
-# Ordered list of metric keys for consistent display
-METRIC_ORDER = [
+# Merged benchmark tables, built once at import and shared as read-only views
+_BENCHMARKS_BY_INDUSTRY = {
+    industry: MappingProxyType(_build_benchmarks(industry)) for industry in INDUSTRY_BENCHMARKS
+}
+
+
+# Ordered metric keys for consistent display
+METRIC_ORDER = (
     "it_spend_pct_revenue",
     "it_spend_per_employee",
     "it_spend_pct_opex",
@@ -1479,7 +1547,10 @@ METRIC_ORDER = [
     "system_availability",
     "it_attrition_rate",
     "helpdesk_cost_per_ticket",
-]
+)
+
+# metric_id -> position in METRIC_ORDER
+METRIC_INDEX = {metric_id: i for i, metric_id in enumerate(METRIC_ORDER)}
 
 # Category display order
 CATEGORIES = [
@@ -1490,3 +1561,61 @@ CATEGORIES = [
     "Cost Structure",
     "Operations",
 ]
+
+
+def _build_ordered_benchmarks(industry: str) -> tuple[tuple[str, MetricSpec], ...]:
+    benchmarks = _BENCHMARKS_BY_INDUSTRY[industry]
+    return tuple(
+        (metric_id, benchmarks[metric_id])
+        for metric_id in METRIC_ORDER
+        if metric_id in benchmarks
+    )
+
+
+# (metric_id, benchmark) pairs per industry in METRIC_ORDER, limited to
+# metrics the industry has benchmark data for
+ORDERED_BENCHMARKS = {industry: _build_ordered_benchmarks(industry) for industry in INDUSTRY_BENCHMARKS}
+
+
+def get_ordered_benchmarks(industry: str) -> tuple[tuple[str, MetricSpec], ...]:
+    """Return an industry's (metric_id, benchmark) pairs in display order."""
+    return ORDERED_BENCHMARKS.get(industry, ())
+
+
+# Ordered (metric_id, benchmark) pairs per industry, grouped by category
+BY_CATEGORY = {
+    industry: {
+        category: tuple(pair for pair in ordered if pair[1].category == category)
+        for category in CATEGORIES
+    }
+    for industry, ordered in ORDERED_BENCHMARKS.items()
+}
+
+
+def get_benchmarks_by_category(industry: str, category: str) -> tuple[tuple[str, MetricSpec], ...]:
+    """Return an industry's (metric_id, benchmark) pairs for one category, in display order."""
+    return BY_CATEGORY.get(industry, {}).get(category, ())
+
+
+def _build_benchmark_arrays(industry: str) -> dict:
+    """
+    Lay out an industry's quartile thresholds as parallel arrays aligned with
+    get_ordered_benchmarks(). Direction is encoded as +1 for higher_is_better
+    and -1 for lower_is_better; "pos" maps each row back to its METRIC_ORDER slot.
+    """
+    ordered = get_ordered_benchmarks(industry)
+    rows = [bench for _, bench in ordered]
+    return {
+        "pos": np.array([METRIC_INDEX[metric_id] for metric_id, _ in ordered], dtype=np.intp),
+        "tq": np.array([b.top_quartile for b in rows], dtype=np.float64),
+        "med": np.array([b.median for b in rows], dtype=np.float64),
+        "bq": np.array([b.bottom_quartile for b in rows], dtype=np.float64),
+        "dir": np.array(
+            [-1 if b.direction == "lower_is_better" else 1 for b in rows],
+            dtype=np.int8,
+        ),
+    }
+
+
+# Struct-of-arrays view of each industry's benchmarks for vectorized scoring
+BENCHMARK_ARRAYS = {industry: _build_benchmark_arrays(industry) for industry in INDUSTRY_BENCHMARKS}
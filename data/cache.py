@@ -0,0 +1,89 @@
+"""
+On-disk cache for fetched payloads (SEC EDGAR JSON, news feeds).
+Entries live under .cache/<namespace>/<md5(url)>.json as
+{"ts": ..., "payload": ..., "etag": ..., "last_modified": ...}; the HTTP validators
+let an expired entry be revalidated with a conditional GET instead of re-downloaded.
+Entries untouched for a week past their TTL are pruned so the directory stays bounded.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+CACHE_ROOT = Path(__file__).resolve().parent.parent / ".cache"
+
+# Expired entries are kept this long past their TTL so they can still be revalidated
+# with a conditional GET; after that set() prunes them
+PRUNE_GRACE = 7 * 24 * 60 * 60
+# Minimum seconds between prune scans of one namespace
+PRUNE_INTERVAL = 60 * 60
+
+
+class FileCache:
+    """A JSON file per key under one namespace directory, expiring after `ttl` seconds."""
+
+    def __init__(self, namespace: str, ttl: float, root: Path = CACHE_ROOT):
+        self.directory = Path(root) / namespace
+        self.ttl = ttl
+        self._next_prune = 0.0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.md5(key.encode()).hexdigest()}.json"
+
+    def get_entry(self, key: str) -> dict | None:
+        """Return the raw entry for `key` regardless of age, or None if missing or unreadable."""
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry.get("ts", 0) <= self.ttl
+
+    def get(self, key: str):
+        """Return the cached payload for `key`, or None if missing, expired or unreadable."""
+        entry = self.get_entry(key)
+        if entry is None or not self.is_fresh(entry):
+            return None
+        return entry.get("payload")
+
+    def set(self, key: str, payload, etag: str | None = None, last_modified: str | None = None) -> None:
+        """
+        Store `payload` for `key` with its HTTP validators, stamped with the current time.
+        Writes are atomic; failures are ignored (the cache is optional).
+        """
+        entry = {"ts": time.time(), "payload": payload, "etag": etag, "last_modified": last_modified}
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(entry, f)
+                os.replace(tmp_path, self._path(key))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, TypeError, ValueError):
+            pass
+
+        now = time.time()
+        if now >= self._next_prune:
+            self._next_prune = now + PRUNE_INTERVAL
+            self.prune()
+
+    def prune(self) -> None:
+        """Delete files (entries or stray temp files) not written within ttl + PRUNE_GRACE."""
+        cutoff = time.time() - self.ttl - PRUNE_GRACE
+        try:
+            paths = list(self.directory.iterdir())
+        except OSError:
+            return
+        for path in paths:
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
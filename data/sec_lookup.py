@@ -3,8 +3,18 @@ SEC EDGAR integration — company search, financial data extraction, and strateg
 Uses the free SEC EDGAR APIs (no API key required).
 """
 import re
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import quote_plus
+from xml.etree import ElementTree
+
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter, Retry
+
+from data.cache import FileCache
 
 # SEC requires a User-Agent with contact info
 SEC_HEADERS = {
@@ -12,6 +22,35 @@ SEC_HEADERS = {
     "Accept-Encoding": "gzip, deflate",
 }
 
+# Shared connection pool for SEC and news traffic; retries 5xx with exponential backoff.
+# Connect and read failures get a single retry so an unreachable or stalled host still
+# fails fast. 429 is not retried: more requests during a rate-limit block only extend
+# it, and waiting out Retry-After would stall the script run inside the spinner.
+# Headers are passed per request since the hosts differ.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=5,
+        connect=1,
+        read=1,
+        backoff_factor=0.5,
+        status_forcelist=[500, 502, 503, 504],
+        respect_retry_after_header=False,
+    ),
+))
+
+# Per-endpoint response caches (TTL in seconds)
+_DAY = 24 * 60 * 60
+_TICKERS_CACHE = FileCache("sec/tickers", ttl=7 * _DAY)
+_SUBMISSIONS_CACHE = FileCache("sec/submissions", ttl=_DAY)
+_COMPANYFACTS_CACHE = FileCache("sec/companyfacts", ttl=_DAY)
+_NEWS_CACHE = FileCache("news", ttl=60 * 60)
+# Extracted get_financials() output; bump the version when the extraction logic changes
+_FINANCIALS_CACHE = FileCache("sec/financials", ttl=_DAY)
+_FINANCIALS_VERSION = 1
+
 # SIC code → industry mapping
 # NOTE: More specific ranges MUST come before broader ranges for correct matching.
 SIC_INDUSTRY_MAP = {
@@ -70,6 +109,28 @@ SIC_INDUSTRY_MAP = {
     range(8200, 8300): "education",
 }
 
+
+def _build_sic_intervals(sic_map: dict) -> list[tuple[int, int, str]]:
+    """
+    Flatten the ordered SIC range map into sorted, non-overlapping (low, high, industry)
+    intervals. Where ranges overlap, the earlier entry wins, matching the map's precedence.
+    """
+    bounds = sorted({b for r in sic_map for b in (r.start, r.stop)})
+    intervals = []
+    for low, stop in zip(bounds, bounds[1:]):
+        industry = next((ind for r, ind in sic_map.items() if low in r), None)
+        if industry is None:
+            continue
+        if intervals and intervals[-1][1] == low - 1 and intervals[-1][2] == industry:
+            intervals[-1] = (intervals[-1][0], stop - 1, industry)
+        else:
+            intervals.append((low, stop - 1, industry))
+    return intervals
+
+
+_SIC_INTERVALS = _build_sic_intervals(SIC_INDUSTRY_MAP)
+_SIC_LOWS = [low for low, _, _ in _SIC_INTERVALS]
+
 # IT-relevant keyword phrases for strategic context extraction.
 # These are multi-word phrases to reduce false positives from generic words like "technology".
 IT_KEYWORDS = [
@@ -104,16 +165,90 @@ IT_KEYWORDS = [
     "automation", "robotic process automation", "RPA",
 ]
 
+# XBRL concepts read from companyfacts (candidate tags in priority order)
+_REVENUE_TAGS = [
+    "RevenueFromContractWithCustomerExcludingAssessedTax",
+    "Revenues",
+    "RevenueFromContractWithCustomerIncludingAssessedTax",
+    "SalesRevenueNet",
+    "InterestAndDividendIncomeOperating",  # banks
+    "TotalRevenuesAndOtherIncome",
+    "PremiumsEarnedNet",  # insurance
+    "NetInterestIncome",  # banks fallback
+]
+_OPEX_TAGS = [
+    "OperatingExpenses",
+    "CostsAndExpenses",
+    "NoninterestExpense",  # banks
+    "BenefitsLossesAndExpenses",  # insurance
+    "OperatingCostsAndExpenses",
+]
+_COMPANYFACTS_CONCEPTS = {
+    "us-gaap": frozenset(_REVENUE_TAGS + _OPEX_TAGS + ["Assets"]),
+    "dei": frozenset(["EntityNumberOfEmployees", "DocumentFiscalYearFocus"]),
+}
+
+# Submissions fields read by search enrichment and get_financials()
+_SUBMISSIONS_FIELDS = ("sic", "name", "tickers")
 
+# Company-name cleanup and Google News title parsing, compiled once
+_COMPANY_SUFFIX_RE = re.compile(r"\b(inc|corp|co|ltd|llc|plc|group|holdings)\b\.?", re.IGNORECASE)
+# Google News titles end with " - Source Name"
+_NEWS_TITLE_RE = re.compile(r"^(.+)\s+-\s+(.+)$")
+
+
+def _cached_get(url: str, cache: FileCache, timeout: float = 10, as_json: bool = True,
+                headers: dict | None = SEC_HEADERS, transform=None):
+    """
+    GET `url`, serving from `cache` while the entry is fresh.
+    An expired entry is revalidated with If-None-Match / If-Modified-Since; a 304
+    re-stamps it and returns the stored payload without downloading the body.
+    Returns parsed JSON (or the response text when as_json is False), passed through
+    `transform` before it is cached when one is given. Transforms must be idempotent:
+    a 304 re-applies them, so entries cached before a transform existed get trimmed too.
+    Raises on HTTP errors; failed responses are never cached.
+    """
+    entry = cache.get_entry(url)
+    if entry is not None and cache.is_fresh(entry):
+        return entry["payload"]
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    resp = _SESSION.get(url, headers=request_headers, timeout=timeout)
+    if resp.status_code == 304 and entry is not None:
+        payload = entry["payload"]
+        if transform is not None:
+            payload = transform(payload)
+        cache.set(url, payload, etag=entry.get("etag"), last_modified=entry.get("last_modified"))
+        return payload
+
+    resp.raise_for_status()
+    payload = resp.json() if as_json else resp.text
+    if transform is not None:
+        payload = transform(payload)
+    cache.set(
+        url, payload,
+        etag=resp.headers.get("ETag"),
+        last_modified=resp.headers.get("Last-Modified"),
+    )
+    return payload
+
+
+@lru_cache(maxsize=1024)
 def sic_to_industry(sic_code: str) -> str | None:
     """Map a SIC code to our industry keys. Returns None if no match."""
     try:
         sic = int(sic_code)
     except (ValueError, TypeError):
         return None
-    for sic_range, industry in SIC_INDUSTRY_MAP.items():
-        if sic in sic_range:
-            return industry
+    i = bisect_right(_SIC_LOWS, sic) - 1
+    if i >= 0 and sic <= _SIC_INTERVALS[i][1]:
+        return _SIC_INTERVALS[i][2]
     return None
 
 
@@ -129,15 +264,7 @@ def search_company(name: str) -> list[dict]:
     search_term = name.strip().upper()
 
     # Primary: use company_tickers.json — only parent entities with tickers
-    try:
-        resp = requests.get(
-            "https://www.sec.gov/files/company_tickers.json",
-            headers=SEC_HEADERS, timeout=10,
-        )
-        resp.raise_for_status()
-        all_tickers = resp.json()
-    except Exception:
-        all_tickers = {}
+    ticker_index = _load_ticker_index()
 
     # Search by company name (word-boundary match) and by ticker (exact)
     seen_ciks = set()
@@ -146,16 +273,13 @@ def search_company(name: str) -> list[dict]:
     # This prevents "UAL" from matching "QUALCOMM"
     word_pattern = re.compile(r"\b" + re.escape(search_term) + r"\b", re.IGNORECASE)
 
-    for entry in all_tickers.values():
-        title = entry.get("title", "")
-        ticker = entry.get("ticker", "")
-        cik = str(entry.get("cik_str", ""))
-
-        if not cik or cik in seen_ciks:
+    for title_upper, ticker_upper, cik, title, ticker in ticker_index:
+        if cik in seen_ciks:
             continue
 
-        # Match: search term as whole word(s) in company name, or exact ticker match
-        if word_pattern.search(title) or search_term == ticker.upper():
+        # Match: search term as whole word(s) in company name, or exact ticker match.
+        # The plain substring test rejects most titles before the regex runs.
+        if (search_term in title_upper and word_pattern.search(title)) or search_term == ticker_upper:
             seen_ciks.add(cik)
             results.append({
                 "name": title,
@@ -168,42 +292,108 @@ def search_company(name: str) -> list[dict]:
         if len(results) >= 10:
             break
 
-    # Enrich with SIC and industry from submissions endpoint (first 5 only for speed)
-    for r in results[:5]:
+    # Enrich with SIC and industry from submissions endpoint (first 5 only for speed);
+    # the lookups are I/O bound, so fetch them concurrently
+    to_enrich = results[:5]
+    if to_enrich:
+        with ThreadPoolExecutor(max_workers=len(to_enrich)) as pool:
+            list(pool.map(_enrich_with_submissions, to_enrich))
+
+    return results
+
+
+# company_tickers.json decoded once per process: (title_upper, ticker_upper, cik, title, ticker)
+# rows in file order, refreshed when older than the on-disk cache TTL
+_ticker_index: list[tuple[str, str, str, str, str]] = []
+_ticker_index_loaded_at = 0.0
+_ticker_index_lock = threading.Lock()
+
+
+def _load_ticker_index() -> list[tuple[str, str, str, str, str]]:
+    """Return the in-process ticker index, (re)building it from company_tickers.json when stale."""
+    global _ticker_index, _ticker_index_loaded_at
+
+    with _ticker_index_lock:
+        if _ticker_index and time.time() - _ticker_index_loaded_at <= _TICKERS_CACHE.ttl:
+            return _ticker_index
+
         try:
-            sub = _get_submissions(r["cik"])
-            r["sic"] = sub.get("sic", "")
-            r["industry"] = sic_to_industry(r["sic"])
-            # Use official name from submissions if available
-            if sub.get("name"):
-                r["name"] = sub["name"]
+            all_tickers = _cached_get("https://www.sec.gov/files/company_tickers.json", _TICKERS_CACHE)
         except Exception:
-            pass
+            return []
+
+        rows = []
+        for entry in all_tickers.values():
+            cik = str(entry.get("cik_str", ""))
+            if not cik:
+                continue
+            title = entry.get("title", "")
+            ticker = entry.get("ticker", "")
+            rows.append((title.upper(), ticker.upper(), cik, title, ticker))
+
+        _ticker_index = rows
+        _ticker_index_loaded_at = time.time()
+        return rows
 
-    return results
+
+def _enrich_with_submissions(result: dict) -> None:
+    """Fill in a search result's SIC, industry and official name in place (best effort)."""
+    try:
+        sub = _get_submissions(result["cik"])
+    except Exception:
+        return
+    result["sic"] = sub.get("sic", "")
+    result["industry"] = sic_to_industry(result["sic"])
+    # Use official name from submissions if available
+    if sub.get("name"):
+        result["name"] = sub["name"]
 
 
 def _get_submissions(cik: str) -> dict:
-    """Get company submissions/metadata from EDGAR."""
+    """
+    Get company submissions/metadata from EDGAR.
+    Memoized in process per day, so a search followed by get_financials() for the
+    same company reads the submissions once; callers must not mutate the result.
+    """
+    return _get_submissions_for_day(cik, int(time.time() // _DAY))
+
+
+@lru_cache(maxsize=256)
+def _get_submissions_for_day(cik: str, day: int) -> dict:
     padded_cik = cik.zfill(10)
     url = f"https://data.sec.gov/submissions/CIK{padded_cik}.json"
-    resp = requests.get(url, headers=SEC_HEADERS, timeout=10)
-    resp.raise_for_status()
-    return resp.json()
+    return _cached_get(url, _SUBMISSIONS_CACHE, transform=_trim_submissions)
+
+
+def _trim_submissions(data: dict) -> dict:
+    """Keep only the submissions fields this module reads; drops the bulky filing history."""
+    return {field: data[field] for field in _SUBMISSIONS_FIELDS if field in data}
 
 
 def get_financials(cik: str) -> dict:
     """
     Pull structured XBRL financial data from SEC EDGAR.
     Returns dict with: revenue, employees, operating_expenses, total_assets, fiscal_year
+    Complete results are cached on disk, so repeat lookups skip decoding companyfacts.
     """
+    key = f"{cik}|v{_FINANCIALS_VERSION}"
+    cached = _FINANCIALS_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    result = _extract_financials(cik)
+    # Only cache complete lookups; errors and missing submissions data are retried
+    if "error" not in result and "sic" in result:
+        _FINANCIALS_CACHE.set(key, result)
+    return result
+
+
+def _extract_financials(cik: str) -> dict:
     padded_cik = cik.zfill(10)
     url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{padded_cik}.json"
 
     try:
-        resp = requests.get(url, headers=SEC_HEADERS, timeout=15)
-        resp.raise_for_status()
-        data = resp.json()
+        data = _cached_get(url, _COMPANYFACTS_CACHE, timeout=15, transform=_trim_companyfacts)
     except Exception as e:
         return {"error": f"Could not fetch XBRL data: {e}"}
 
@@ -214,30 +404,13 @@ def get_financials(cik: str) -> dict:
     result = {}
 
     # Revenue — try multiple XBRL tags
-    revenue_tags = [
-        "RevenueFromContractWithCustomerExcludingAssessedTax",
-        "Revenues",
-        "RevenueFromContractWithCustomerIncludingAssessedTax",
-        "SalesRevenueNet",
-        "InterestAndDividendIncomeOperating",  # banks
-        "TotalRevenuesAndOtherIncome",
-        "PremiumsEarnedNet",  # insurance
-        "NetInterestIncome",  # banks fallback
-    ]
-    result["revenue"], rev_end = _get_latest_annual(us_gaap, revenue_tags)
+    result["revenue"], rev_end = _get_latest_annual(us_gaap, _REVENUE_TAGS)
 
     # Employees
     result["employees"], _ = _get_latest_annual(dei, ["EntityNumberOfEmployees"])
 
     # Operating Expenses
-    opex_tags = [
-        "OperatingExpenses",
-        "CostsAndExpenses",
-        "NoninterestExpense",  # banks
-        "BenefitsLossesAndExpenses",  # insurance
-        "OperatingCostsAndExpenses",
-    ]
-    result["operating_expenses"], _ = _get_latest_annual(us_gaap, opex_tags)
+    result["operating_expenses"], _ = _get_latest_annual(us_gaap, _OPEX_TAGS)
 
     # Total Assets
     result["total_assets"], assets_end = _get_latest_annual(us_gaap, ["Assets"])
@@ -259,6 +432,17 @@ def get_financials(cik: str) -> dict:
     return result
 
 
+def _trim_companyfacts(data: dict) -> dict:
+    """Keep only the XBRL concepts get_financials() reads, so the cached copy stays small."""
+    facts = data.get("facts", {})
+    return {
+        "facts": {
+            taxonomy: {tag: concept for tag, concept in facts.get(taxonomy, {}).items() if tag in wanted}
+            for taxonomy, wanted in _COMPANYFACTS_CONCEPTS.items()
+        }
+    }
+
+
 def _get_latest_annual(taxonomy: dict, tag_names: list[str]) -> tuple[int, str] | tuple[None, str]:
     """
     Extract the most recent annual (10-K) value across all candidate XBRL tags.
@@ -282,13 +466,14 @@ def _get_latest_annual(taxonomy: dict, tag_names: list[str]) -> tuple[int, str]
                     values = units[first_unit]
                 continue
 
-            # Filter for 10-K annual filings
-            annual_values = [v for v in values if v.get("form") in ("10-K", "10-K/A")]
+            # Most recent 10-K annual filing by end date (single pass; ties keep the first)
+            candidate = max(
+                (v for v in values if v.get("form") in ("10-K", "10-K/A")),
+                key=lambda x: x.get("end", x.get("filed", "")),
+                default=None,
+            )
 
-            if annual_values:
-                # Sort by end date descending to get most recent
-                annual_values.sort(key=lambda x: x.get("end", x.get("filed", "")), reverse=True)
-                candidate = annual_values[0]
+            if candidate is not None:
                 candidate_end = candidate.get("end", "")
                 candidate_val = candidate.get("val")
 
@@ -309,9 +494,8 @@ def _get_fiscal_year(dei: dict, rev_end: str, assets_end: str) -> str:
     units = fiscal_year.get("units", {})
     for unit_values in units.values():
         if unit_values:
-            sorted_vals = sorted(unit_values, key=lambda x: x.get("end", ""), reverse=True)
-            if sorted_vals:
-                return str(sorted_vals[0].get("val", ""))
+            latest = max(unit_values, key=lambda x: x.get("end", ""))
+            return str(latest.get("val", ""))
 
     # Fallback: use the end date from the revenue or assets data we actually pulled
     best_end = rev_end or assets_end
@@ -327,83 +511,79 @@ def get_strategic_context(company_name: str, max_items: int = 5) -> list[dict]:
     Uses Google News RSS to find relevant articles.
     Returns a list of dicts: [{title, source, url, date}]
     """
-    import warnings
-    from bs4 import XMLParsedAsHTMLWarning
-    warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
-
     # Clean up company name for search (remove Inc., Corp., etc.)
-    clean_name = re.sub(r"\b(inc|corp|co|ltd|llc|plc|group|holdings)\b\.?", "", company_name, flags=re.IGNORECASE).strip()
-    clean_name = re.sub(r"\s+", " ", clean_name).strip()
+    clean_name = " ".join(_COMPANY_SUFFIX_RE.sub("", company_name).split())
     # Remove trailing punctuation
     clean_name = clean_name.rstrip(" ,&/")
 
-    # Search Google News RSS for IT/technology news about this company
-    search_queries = [
-        f"{clean_name} technology spending IT budget AI investment",
-        f"{clean_name} cybersecurity cloud digital transformation",
-    ]
+    # Search Google News RSS for IT/technology news about this company; a single
+    # OR-joined query covers both the spending and the security/cloud themes
+    query = (
+        f'{clean_name} ("technology spending" OR "IT budget" OR "AI investment" '
+        f'OR cybersecurity OR cloud OR "digital transformation")'
+    )
+    url = f"https://news.google.com/rss/search?q={quote_plus(query)}&hl=en-US&gl=US&ceid=US:en"
+    feed = _fetch_news_feed(url)
+    if feed is None:
+        return []
+
+    # The feed is RSS (XML); parse it as such rather than through an HTML parser
+    try:
+        root = ElementTree.fromstring(feed)
+    except ElementTree.ParseError:
+        return []
+
+    # Titles must mention the company's first name word (at least partially)
+    name_parts = clean_name.upper().split()
+    first_word = name_parts[0] if name_parts else ""
 
     all_articles = []
     seen_titles = set()
 
-    for query in search_queries:
-        encoded = query.replace(" ", "+")
-        url = f"https://news.google.com/rss/search?q={encoded}&hl=en-US&gl=US&ceid=US:en"
+    for item in root.findall("channel/item")[:15]:
+        raw_title = (item.findtext("title") or "").strip()
+        title_key = raw_title.lower()
+        if not raw_title or title_key in seen_titles:
+            continue
 
-        try:
-            resp = requests.get(url, timeout=10)
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
-            items = soup.find_all("item")
-
-            for item in items[:15]:
-                title_tag = item.find("title")
-                raw_title = title_tag.text.strip() if title_tag else ""
-                if not raw_title or raw_title.lower() in seen_titles:
-                    continue
-
-                # Google News titles end with " - Source Name"
-                # Parse the source name from the title
-                source_name = ""
-                title = raw_title
-                title_match = re.match(r"^(.+)\s+-\s+(.+)$", raw_title)
-                if title_match:
-                    title = title_match.group(1).strip()
-                    source_name = title_match.group(2).strip()
-
-                # Article URL: in Google News RSS, <link/> is self-closing and the
-                # actual URL is the text node immediately after it
-                link_tag = item.find("link")
-                article_url = ""
-                if link_tag and link_tag.next_sibling:
-                    article_url = str(link_tag.next_sibling).strip()
-
-                source_tag = item.find("source")
-                # Fallback: get source name from tag if not parsed from title
-                if not source_name and source_tag and source_tag.text:
-                    source_name = source_tag.text.strip()
-
-                pubdate_tag = item.find("pubdate")
-                date_str = pubdate_tag.text.strip() if pubdate_tag else ""
-
-                # Filter: title must mention the company (at least partially)
-                name_parts = clean_name.upper().split()
-                first_word = name_parts[0] if name_parts else ""
-                if first_word and first_word not in raw_title.upper():
-                    continue
-
-                seen_titles.add(raw_title.lower())
-                all_articles.append({
-                    "title": title,
-                    "source": source_name,
-                    "url": article_url,
-                    "date": date_str,
-                })
-        except Exception:
+        # Parse the source name from the title
+        source_name = ""
+        title = raw_title
+        title_match = _NEWS_TITLE_RE.match(raw_title)
+        if title_match:
+            title = title_match.group(1).strip()
+            source_name = title_match.group(2).strip()
+
+        article_url = (item.findtext("link") or "").strip()
+
+        # Fallback: get source name from <source> if not parsed from title
+        if not source_name:
+            source_name = (item.findtext("source") or "").strip()
+
+        date_str = (item.findtext("pubDate") or "").strip()
+
+        # Filter: title must mention the company
+        if first_word and first_word not in raw_title.upper():
             continue
 
+        seen_titles.add(title_key)
+        all_articles.append({
+            "title": title,
+            "source": source_name,
+            "url": article_url,
+            "date": date_str,
+        })
+
     if not all_articles:
         return []
 
     # Return the top N most recent (they come sorted by relevance from Google)
     return all_articles[:max_items]
+
+
+def _fetch_news_feed(url: str) -> str | None:
+    """Fetch one Google News RSS feed, or None if the request fails."""
+    try:
+        return _cached_get(url, _NEWS_CACHE, as_json=False, headers=None)
+    except Exception:
+        return None
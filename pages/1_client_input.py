@@ -1,43 +1,97 @@
 """
 Page 1: Client Data Input Form
 """
-import streamlit as st
-from data.benchmarks import INDUSTRIES
-from data.sec_lookup import search_company, get_financials, get_strategic_context, sic_to_industry
-
-# Industries we have benchmark data for
-SUPPORTED_INDUSTRIES = set(INDUSTRIES.keys())
-
-
-def _format_dollars(val):
-    """Format a large dollar amount for display."""
-    if val is None:
-        return "N/A"
-    if val >= 1_000_000_000:
-        return f"${val / 1_000_000_000:,.1f}B"
-    elif val >= 1_000_000:
-        return f"${val / 1_000_000:,.0f}M"
-    else:
-        return f"${val:,.0f}"
+from concurrent.futures import ThreadPoolExecutor
 
-
-def show():
-    st.header("Client Data Input")
-    st.markdown(
-        "Enter your client's IT metrics below. All dollar values in USD. "
-        "The analysis will compare these against industry benchmarks."
-    )
-
-    # ── SEC Lookup Section ─────────────────────────────────────────
+import streamlit as st
+from data.benchmarks import (
+    INDUSTRIES,
+    INDUSTRY_KEY_TO_INDEX,
+    INDUSTRY_NAME_TO_KEY,
+    INDUSTRY_NAMES,
+    SUB_VERTICALS,
+    SUPPORTED_INDUSTRIES,
+    SUPPORTED_INDUSTRIES_MD,
+    format_dollars,
+)
+
+
+# ── Cached SEC lookups ─────────────────────────────────────────────
+# Shared across sessions. A failed or empty lookup raises so st.cache_data
+# does not memoize it, and the caller still gets the result to display.
+# data.sec_lookup (and requests with it) is imported on first use, so pages
+# filled in by hand never load it.
+
+class _LookupFailed(Exception):
+    def __init__(self, result):
+        super().__init__()
+        self.result = result
+
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _cached_search(name):
+    from data.sec_lookup import search_company
+
+    results = search_company(name)
+    if not results:
+        raise _LookupFailed(results)
+    return results
+
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _cached_financials(cik):
+    from data.sec_lookup import get_financials
+
+    financials = get_financials(cik)
+    if financials.get("error"):
+        raise _LookupFailed(financials)
+    return financials
+
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _cached_context(company_name):
+    from data.sec_lookup import get_strategic_context
+
+    context = get_strategic_context(company_name)
+    if not context:
+        raise _LookupFailed(context)
+    return context
+
+
+def _lookup(cached_fn, arg):
+    """Call a cached lookup, returning the uncached result when it failed."""
+    try:
+        return cached_fn(arg)
+    except _LookupFailed as e:
+        return e.result
+
+
+def _news_markdown(context):
+    """Render news articles as one markdown string, one paragraph per item."""
+    lines = []
+    for i, article in enumerate(context, 1):
+        title = article.get("title", "")
+        source = article.get("source", "")
+        url = article.get("url", "")
+        source_link = f" — [{source}]({url})" if source and url else (f" — {source}" if source else "")
+        lines.append(f"**{i}.** {title}{source_link}")
+    return "\n\n".join(lines)
+
+
+@st.fragment
+def _sec_lookup():
+    """
+    Company search, result picker and SEC fetch. Runs as a fragment so typing a
+    search or re-running it reruns only this block; selecting a company triggers
+    a full rerun so the banner and form below pick up the prefill.
+    """
     st.subheader("Company Lookup")
-    supported_names = sorted(v["name"] for v in INDUSTRIES.values())
-    supported_list = ", ".join(f"**{n}**" for n in supported_names)
     st.caption(
         "Search any public company to auto-fill financials and see recent IT & technology news.  \n"
-        f"Benchmarking is available for: {supported_list}."
+        f"Benchmarking is available for: {SUPPORTED_INDUSTRIES_MD}."
     )
 
-    lookup_col1, lookup_col2 = st.columns([3, 1])
+    lookup_col1, lookup_col2 = st.columns([3, 1], vertical_alignment="bottom")
     with lookup_col1:
         search_name = st.text_input(
             "Search Company Name or Ticker",
@@ -46,34 +100,46 @@ def show():
             key="search_input",
         )
     with lookup_col2:
-        st.markdown("")  # vertical spacer
         lookup_clicked = st.button("Search SEC Filing", type="primary", use_container_width=True)
 
     # Handle search
     if lookup_clicked and search_name:
         st.session_state["search_name"] = search_name
+        previous_cik = st.session_state.get("sec_selected_cik")
         with st.spinner("Searching SEC EDGAR..."):
-            results = search_company(search_name)
+            # search_company only sees the trimmed, upper-cased name, so key the cache on
+            # that: "jpmorgan", "JPMorgan " and "JPMORGAN" share one entry
+            results = _lookup(_cached_search, search_name.strip().upper())
             # Clear ALL old state so stale data doesn't persist
             st.session_state["sec_search_results"] = results
+            st.session_state["sec_option_labels"] = [
+                r["name"] + (f" ({r['ticker']})" if r.get("ticker") else "") for r in results
+            ]
             st.session_state["sec_selected"] = None
             st.session_state["sec_selected_cik"] = None
             st.session_state["sec_financials"] = None
-            st.session_state["sec_context"] = None
+            st.session_state["sec_news"] = None
             st.session_state["sec_prefill"] = {}
+            st.session_state["sec_banner"] = None
             st.session_state.pop("company_select", None)
 
+        # A company shown before this search is now cleared; rerun the whole page
+        # so its banner and prefilled form go too. (A hit reruns via the fetch below.)
+        if previous_cik and not results:
+            st.rerun()
+
     # Show search results
     if st.session_state.get("sec_search_results"):
         results = st.session_state["sec_search_results"]
         if not results:
             st.warning("No SEC filings found. Enter data manually below.")
         else:
-            options = [f"{r['name']}" + (f" ({r['ticker']})" if r.get('ticker') else "") for r in results]
+            # Options are indices so results sharing a "Name (TICKER)" label stay selectable
+            option_labels = st.session_state["sec_option_labels"]
             selected_idx = st.selectbox(
                 "Select Company",
-                range(len(options)),
-                format_func=lambda i: options[i],
+                range(len(option_labels)),
+                format_func=option_labels.__getitem__,
                 key="company_select",
             )
 
@@ -84,12 +150,31 @@ def show():
                 # Only fetch if we haven't already for this CIK
                 if st.session_state.get("sec_selected_cik") != cik:
                     with st.spinner("Pulling financials and IT insights..."):
-                        financials = get_financials(cik)
+                        # Financials and news are independent; fetch them side by side
+                        with ThreadPoolExecutor(max_workers=2) as pool:
+                            financials_future = pool.submit(_lookup, _cached_financials, cik)
+                            context_future = pool.submit(_lookup, _cached_context, selected["name"])
+                            financials = financials_future.result()
+                            context = context_future.result()
                         company_display_name = financials.get("company_name", selected["name"])
-                        context = get_strategic_context(company_display_name)
                         st.session_state["sec_selected_cik"] = cik
                         st.session_state["sec_financials"] = financials
-                        st.session_state["sec_context"] = context
+
+                        # Summary banner and news list, built once per selected company.
+                        # The banner is reset to None when financials came back with an error,
+                        # so a previously selected company's banner never carries over.
+                        st.session_state["sec_news"] = _news_markdown(context) if context else None
+                        if financials.get("error"):
+                            st.session_state["sec_banner"] = None
+                        else:
+                            employees = financials.get("employees")
+                            st.session_state["sec_banner"] = (
+                                f"**Pre-filled from {financials.get('fiscal_year', 'N/A')} 10-K:** "
+                                f"Revenue {format_dollars(financials.get('revenue'))}  |  "
+                                f"Employees {f'{employees:,}' if employees else 'N/A'}  |  "
+                                f"OpEx {format_dollars(financials.get('operating_expenses'))}  |  "
+                                f"Total Assets {format_dollars(financials.get('total_assets'))}"
+                            )
 
                         # Pre-fill session state for form defaults
                         prefill = {}
@@ -112,35 +197,34 @@ def show():
                         st.session_state["sec_prefill"] = prefill
                         st.rerun()
 
+
+def show():
+    st.header("Client Data Input")
+    st.markdown(
+        "Enter your client's IT metrics below. All dollar values in USD. "
+        "The analysis will compare these against industry benchmarks."
+    )
+
+    # ── SEC Lookup Section ─────────────────────────────────────────
+    _sec_lookup()
+
     # Show pre-filled info
     financials = st.session_state.get("sec_financials")
     prefill = st.session_state.get("sec_prefill", {})
     detected_industry = prefill.get("industry")
     has_sic = bool(prefill.get("sic"))  # We found a SIC code from SEC
-    industry_supported = detected_industry in SUPPORTED_INDUSTRIES if detected_industry else False
-
-    if financials and not financials.get("error"):
-        fiscal_year = financials.get("fiscal_year", "N/A")
-        rev = _format_dollars(financials.get("revenue"))
-        emp = f"{financials.get('employees', 'N/A'):,}" if financials.get("employees") else "N/A"
-        opex = _format_dollars(financials.get("operating_expenses"))
-        assets = _format_dollars(financials.get("total_assets"))
-
-        st.success(
-            f"**Pre-filled from {fiscal_year} 10-K:** "
-            f"Revenue {rev}  |  Employees {emp}  |  OpEx {opex}  |  Total Assets {assets}"
-        )
+    industry_supported = detected_industry in SUPPORTED_INDUSTRIES
+
+    banner = st.session_state.get("sec_banner")
+
+    if banner:
+        st.success(banner)
 
         # IT strategy news and insights
-        context = st.session_state.get("sec_context", [])
-        if context:
+        news = st.session_state.get("sec_news")
+        if news:
             st.subheader("Recent IT & Technology News")
-            for i, article in enumerate(context, 1):
-                title = article.get("title", "")
-                source = article.get("source", "")
-                url = article.get("url", "")
-                source_link = f" — [{source}]({url})" if source and url else (f" — {source}" if source else "")
-                st.markdown(f"**{i}.** {title}{source_link}")
+            st.markdown(news)
 
         # Unsupported industry warning — block form if SIC is known but not in our supported list
         if has_sic and not industry_supported:
@@ -149,24 +233,21 @@ def show():
             st.warning(
                 f"**Sector not yet supported for benchmarking.** "
                 f"This company's SIC code ({sic_code}) does not map to a sector we have benchmark data for. "
-                f"We currently support: {supported_list}. "
+                f"We currently support: {SUPPORTED_INDUSTRIES_MD}. "
                 f"The financials and strategic context above are still useful for your analysis — "
                 f"benchmarking for additional sectors is coming soon."
             )
             st.stop()
 
-    elif financials and financials.get("error"):
-        st.warning(f"Could not pull financials: {financials['error']}")
+    elif financials:
+        st.warning(f"Could not pull financials: {financials.get('error')}")
 
     st.divider()
 
     # ── Industry selector ──────────────────────────────────────────
-    industry_keys = list(INDUSTRIES.keys())
-    industry_names = [INDUSTRIES[k]["name"] for k in industry_keys]
-
     if detected_industry and industry_supported:
         # Industry was auto-detected and supported — show as confirmation
-        default_idx = industry_keys.index(detected_industry)
+        default_idx = INDUSTRY_KEY_TO_INDEX[detected_industry]
         detected_name = INDUSTRIES[detected_industry]["name"]
         st.markdown(f"**Industry:** {detected_name} *(auto-detected from SEC filing — change below if incorrect)*")
         with st.expander("Change Industry / Sub-Vertical", expanded=False):
@@ -174,45 +255,47 @@ def show():
             with col1:
                 selected_industry_name = st.selectbox(
                     "Industry",
-                    industry_names,
+                    INDUSTRY_NAMES,
                     index=default_idx,
                 )
-                selected_industry = industry_keys[industry_names.index(selected_industry_name)]
+                selected_industry = INDUSTRY_NAME_TO_KEY[selected_industry_name]
             with col2:
-                sub_verticals = INDUSTRIES[selected_industry]["sub_verticals"]
+                sub_verticals = SUB_VERTICALS[selected_industry]
                 sub_vertical = st.selectbox("Sub-Vertical", sub_verticals, index=0)
     else:
         # No auto-detect or not from SEC — user must pick
-        col1, col2, col3 = st.columns(3)
+        # Empty third column keeps the selectors at the form's column width
+        col1, col2, _ = st.columns(3)
         with col1:
             selected_industry_name = st.selectbox(
                 "Industry",
-                industry_names,
+                INDUSTRY_NAMES,
                 index=0,
             )
-            selected_industry = industry_keys[industry_names.index(selected_industry_name)]
+            selected_industry = INDUSTRY_NAME_TO_KEY[selected_industry_name]
         with col2:
-            sub_verticals = INDUSTRIES[selected_industry]["sub_verticals"]
+            sub_verticals = SUB_VERTICALS[selected_industry]
             sub_vertical = st.selectbox("Sub-Vertical", sub_verticals, index=0)
-        with col3:
-            st.markdown("")
 
     st.divider()
 
     # ── Main Input Form ────────────────────────────────────────────
+    # Form defaults: SEC prefill over previously submitted values
+    defaults = {**(st.session_state.get("client_data") or {}), **prefill}
+
     with st.form("client_input_form"):
         st.subheader("Company Profile")
         col1, col2, col3 = st.columns(3)
         with col1:
             company_name = st.text_input(
                 "Company Name",
-                value=prefill.get("company_name", st.session_state.get("client_data", {}).get("company_name", "")),
+                value=defaults.get("company_name", ""),
             )
         with col2:
             revenue = st.number_input(
                 "Annual Revenue ($)",
                 min_value=0,
-                value=prefill.get("revenue", st.session_state.get("client_data", {}).get("revenue", 0)),
+                value=defaults.get("revenue", 0),
                 step=1_000_000,
                 format="%d",
                 help="Total annual revenue in USD",
@@ -221,7 +304,7 @@ def show():
             total_employees = st.number_input(
                 "Total Employees",
                 min_value=0,
-                value=prefill.get("total_employees", st.session_state.get("client_data", {}).get("total_employees", 0)),
+                value=defaults.get("total_employees", 0),
                 step=100,
                 format="%d",
                 help="Total firm headcount (not just IT)",
@@ -237,14 +320,14 @@ def show():
             it_budget = st.number_input(
                 "Total IT Budget ($)",
                 min_value=0,
-                value=st.session_state.get("client_data", {}).get("it_budget", 0),
+                value=defaults.get("it_budget", 0),
                 step=100_000,
                 format="%d",
             )
             it_budget_prior = st.number_input(
                 "IT Budget Prior Year ($)",
                 min_value=0,
-                value=st.session_state.get("client_data", {}).get("it_budget_prior_year", 0),
+                value=defaults.get("it_budget_prior_year", 0),
                 step=100_000,
                 format="%d",
                 help="For YoY growth calculation",
@@ -253,7 +336,7 @@ def show():
             total_opex = st.number_input(
                 "Total Operating Expenses ($)",
                 min_value=0,
-                value=prefill.get("total_opex", st.session_state.get("client_data", {}).get("total_opex", 0)),
+                value=defaults.get("total_opex", 0),
                 step=1_000_000,
                 format="%d",
                 help="Total firm operating expenses",
@@ -261,7 +344,7 @@ def show():
             cloud_spend = st.number_input(
                 "Cloud Spend ($)",
                 min_value=0,
-                value=st.session_state.get("client_data", {}).get("cloud_spend", 0),
+                value=defaults.get("cloud_spend", 0),
                 step=100_000,
                 format="%d",
                 help="IaaS + PaaS + SaaS spend",
@@ -270,14 +353,14 @@ def show():
             cybersecurity_spend = st.number_input(
                 "Cybersecurity Spend ($)",
                 min_value=0,
-                value=st.session_state.get("client_data", {}).get("cybersecurity_spend", 0),
+                value=defaults.get("cybersecurity_spend", 0),
                 step=100_000,
                 format="%d",
             )
             it_labor_cost = st.number_input(
                 "IT Labor Costs ($)",
                 min_value=0,
-                value=st.session_state.get("client_data", {}).get("it_labor_cost", 0),
+                value=defaults.get("it_labor_cost", 0),
                 step=100_000,
                 format="%d",
                 help="Internal IT salaries + benefits",
@@ -288,14 +371,14 @@ def show():
             outsourcing_spend = st.number_input(
                 "Outsourcing Spend ($)",
                 min_value=0,
-                value=st.session_state.get("client_data", {}).get("outsourcing_spend", 0),
+                value=defaults.get("outsourcing_spend", 0),
                 step=100_000,
                 format="%d",
             )
             application_spend = st.number_input(
                 "Application Spend ($)",
                 min_value=0,
-                value=st.session_state.get("client_data", {}).get("application_spend", 0),
+                value=defaults.get("application_spend", 0),
                 step=100_000,
                 format="%d",
                 help="Application development, licensing, maintenance",
@@ -304,7 +387,7 @@ def show():
             infrastructure_spend = st.number_input(
                 "Infrastructure Spend ($)",
                 min_value=0,
-                value=st.session_state.get("client_data", {}).get("infrastructure_spend", 0),
+                value=defaults.get("infrastructure_spend", 0),
                 step=100_000,
                 format="%d",
                 help="Servers, network, data center, hosting",
@@ -322,7 +405,7 @@ def show():
                 "Run %",
                 min_value=0.0,
                 max_value=100.0,
-                value=float(st.session_state.get("client_data", {}).get("run_pct", 0) or 0),
+                value=float(defaults.get("run_pct", 0) or 0),
                 step=1.0,
                 help="Keep-the-lights-on operations",
             )
@@ -331,7 +414,7 @@ def show():
                 "Grow %",
                 min_value=0.0,
                 max_value=100.0,
-                value=float(st.session_state.get("client_data", {}).get("grow_pct", 0) or 0),
+                value=float(defaults.get("grow_pct", 0) or 0),
                 step=1.0,
                 help="Enhance existing capabilities",
             )
@@ -340,7 +423,7 @@ def show():
                 "Transform %",
                 min_value=0.0,
                 max_value=100.0,
-                value=float(st.session_state.get("client_data", {}).get("transform_pct", 0) or 0),
+                value=float(defaults.get("transform_pct", 0) or 0),
                 step=1.0,
                 help="New, transformative initiatives",
             )
@@ -356,7 +439,7 @@ def show():
         it_ftes = st.number_input(
             "Total IT FTEs",
             min_value=0,
-            value=st.session_state.get("client_data", {}).get("it_ftes", 0),
+            value=defaults.get("it_ftes", 0),
             step=10,
             format="%d",
             help="Full-time equivalent IT staff (internal only)",
@@ -372,7 +455,7 @@ def show():
                 "Core System Availability (%)",
                 min_value=90.0,
                 max_value=100.0,
-                value=float(st.session_state.get("client_data", {}).get("system_availability", 99.95)),
+                value=float(defaults.get("system_availability", 99.95)),
                 step=0.01,
                 format="%.2f",
                 help="Average uptime of core systems",
@@ -381,7 +464,7 @@ def show():
             helpdesk_cost = st.number_input(
                 "Help Desk Cost per Ticket ($)",
                 min_value=0.0,
-                value=float(st.session_state.get("client_data", {}).get("helpdesk_cost_per_ticket", 0) or 0),
+                value=float(defaults.get("helpdesk_cost_per_ticket", 0) or 0),
                 step=1.0,
                 format="%.0f",
             )
@@ -390,7 +473,7 @@ def show():
                 "IT Staff Attrition Rate (%)",
                 min_value=0.0,
                 max_value=100.0,
-                value=float(st.session_state.get("client_data", {}).get("it_attrition_rate", 0) or 0),
+                value=float(defaults.get("it_attrition_rate", 0) or 0),
                 step=0.5,
                 format="%.1f",
             )
@@ -405,15 +488,13 @@ def show():
         )
 
         if submitted:
-            errors = []
-            if not company_name:
-                errors.append("Company name is required.")
-            if revenue <= 0:
-                errors.append("Revenue must be greater than 0.")
-            if total_employees <= 0:
-                errors.append("Total employees must be greater than 0.")
-            if it_budget <= 0:
-                errors.append("IT budget must be greater than 0.")
+            checks = [
+                (bool(company_name), "Company name is required."),
+                (revenue > 0, "Revenue must be greater than 0."),
+                (total_employees > 0, "Total employees must be greater than 0."),
+                (it_budget > 0, "IT budget must be greater than 0."),
+            ]
+            errors = [message for ok, message in checks if not ok]
 
             if errors:
                 for e in errors:
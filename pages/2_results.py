@@ -11,18 +11,7 @@ from charts.plots import (
     COLORS,
     QUARTILE_LABELS,
 )
-
-
-def format_value(value, unit, fmt):
-    """Format a metric value for display."""
-    if unit == "$":
-        return f"${value:{fmt}}"
-    elif unit == "%":
-        return f"{value:{fmt}}%"
-    elif unit == "ratio":
-        return f"1:{value:.0f}"
-    else:
-        return f"{value:{fmt}}"
+from data.benchmarks import FORMATTERS
 
 
 def show():
@@ -37,9 +26,8 @@ def show():
     industry = client_data.get("industry", "financial_services")
     industry_name = client_data.get("industry_name", "Financial Services")
 
-    # Run analysis with selected industry
+    # Run analysis with selected industry (memoized on client_data contents)
     results = run_full_analysis(client_data, industry=industry)
-    st.session_state["analysis_results"] = results
 
     if not results:
         st.warning("No metrics could be computed. Please check the input data.")
@@ -94,27 +82,23 @@ def show():
     # ── Detailed Table ─────────────────────────────────────────────
     st.subheader("Detailed Comparison Table")
 
-    table_data = []
-    for r in results:
-        quartile_label = QUARTILE_LABELS[r["quartile"]]
-        delta_pct = r["delta_pct"]
-        delta_str = f"{delta_pct:+.1f}% vs median"
-
-        table_data.append(
-            {
-                "Category": r["category"],
-                "Metric": r["name"],
-                "Your Value": format_value(r["value"], r["unit"], r["format"]),
-                "Top Quartile": format_value(r["top_quartile"], r["unit"], r["format"]),
-                "Median": format_value(r["median"], r["unit"], r["format"]),
-                "Bottom Quartile": format_value(r["bottom_quartile"], r["unit"], r["format"]),
-                "Position": quartile_label,
-                "Delta": delta_str,
-                "Score": f"{r['score']:.0f}/100",
-            }
-        )
-
-    df = pd.DataFrame(table_data)
+    # Built column by column; each formatter is looked up once per metric.
+    # Every column is display text, so the dtype is given rather than inferred.
+    fmts = [FORMATTERS[r["metric_id"]] for r in results]
+    df = pd.DataFrame(
+        {
+            "Category": [r["category"] for r in results],
+            "Metric": [r["name"] for r in results],
+            "Your Value": [fmt(r["value"]) for fmt, r in zip(fmts, results)],
+            "Top Quartile": [fmt(r["top_quartile"]) for fmt, r in zip(fmts, results)],
+            "Median": [fmt(r["median"]) for fmt, r in zip(fmts, results)],
+            "Bottom Quartile": [fmt(r["bottom_quartile"]) for fmt, r in zip(fmts, results)],
+            "Position": [QUARTILE_LABELS[r["quartile"]] for r in results],
+            "Delta": [f"{r['delta_pct']:+.1f}% vs median" for r in results],
+            "Score": [f"{r['score']:.0f}/100" for r in results],
+        },
+        dtype=str,
+    )
     st.dataframe(
         df,
         use_container_width=True,
@@ -125,25 +109,30 @@ def show():
     st.divider()
     st.subheader("Key Findings")
 
-    # Strengths (top quartile)
-    strengths = [r for r in results if r["quartile"] == "top_quartile"]
-    weaknesses = [r for r in results if r["quartile"] == "bottom_quartile"]
-    opportunities = [r for r in results if r["quartile"] == "below_median"]
+    # Strengths (top quartile), concerns (bottom quartile), opportunities (below median)
+    buckets = {"top_quartile": [], "bottom_quartile": [], "below_median": []}
+    for r in results:
+        bucket = buckets.get(r["quartile"])
+        if bucket is not None:
+            bucket.append(r)
+    strengths = buckets["top_quartile"]
+    weaknesses = buckets["bottom_quartile"]
+    opportunities = buckets["below_median"]
 
     if strengths:
         st.markdown("**Strengths (Top Quartile)**")
         for r in strengths:
-            st.markdown(f"- **{r['name']}**: {format_value(r['value'], r['unit'], r['format'])} — {r['insight']}")
+            st.markdown(f"- **{r['name']}**: {FORMATTERS[r['metric_id']](r['value'])} — {r['insight']}")
 
     if weaknesses:
         st.markdown("**Areas of Concern (Bottom Quartile)**")
         for r in weaknesses:
-            st.markdown(f"- **{r['name']}**: {format_value(r['value'], r['unit'], r['format'])} — {r['insight']}")
+            st.markdown(f"- **{r['name']}**: {FORMATTERS[r['metric_id']](r['value'])} — {r['insight']}")
 
     if opportunities:
         st.markdown("**Improvement Opportunities (Below Median)**")
         for r in opportunities:
-            st.markdown(f"- **{r['name']}**: {format_value(r['value'], r['unit'], r['format'])} — {r['insight']}")
+            st.markdown(f"- **{r['name']}**: {FORMATTERS[r['metric_id']](r['value'])} — {r['insight']}")
 
     if not strengths and not weaknesses and not opportunities:
         st.markdown("All metrics are at or near the industry median. A solid, balanced position.")
@@ -4,19 +4,7 @@ Page 3: Detailed Analysis — drill into each metric with context and insights.
 import streamlit as st
 from analysis.engine import run_full_analysis
 from charts.plots import create_metric_bar_chart, COLORS, QUARTILE_LABELS
-from data.benchmarks import CATEGORIES, get_benchmarks
-
-
-def format_value(value, unit, fmt):
-    """Format a metric value for display."""
-    if unit == "$":
-        return f"${value:{fmt}}"
-    elif unit == "%":
-        return f"{value:{fmt}}%"
-    elif unit == "ratio":
-        return f"1:{value:.0f}"
-    else:
-        return f"{value:{fmt}}"
+from data.benchmarks import CATEGORIES, FORMATTERS, get_benchmarks_by_category
 
 
 def show():
@@ -38,38 +26,26 @@ def show():
 
     st.caption(f"Detailed analysis for **{company_name}** — {industry_name} benchmarks")
 
-    # Get benchmark data for description lookups
-    benchmarks = get_benchmarks(industry)
-
-    # Group results by category
-    results_by_category = {}
-    for r in results:
-        cat = r["category"]
-        if cat not in results_by_category:
-            results_by_category[cat] = []
-        results_by_category[cat].append(r)
-
-    # Category icons
-    cat_icons = {
-        "Spend": "Spend",
-        "Staffing": "Staffing",
-        "Budget Allocation": "Budget Allocation",
-        "Technology Mix": "Technology Mix",
-        "Cost Structure": "Cost Structure",
-        "Operations": "Operations",
-    }
+    results_by_id = {r["metric_id"]: r for r in results}
 
     # Display by category
     for category in CATEGORIES:
-        if category not in results_by_category:
+        # Benchmarks are pre-grouped by category; keep the ones with a computed result
+        rows = [
+            (results_by_id[metric_id], bench)
+            for metric_id, bench in get_benchmarks_by_category(industry, category)
+            if metric_id in results_by_id
+        ]
+        if not rows:
             continue
 
-        st.subheader(cat_icons.get(category, category))
+        st.subheader(category)
 
-        for r in results_by_category[category]:
+        for r, bench in rows:
             quartile = r["quartile"]
             quartile_label = QUARTILE_LABELS[quartile]
             color = COLORS[quartile]
+            fmt = FORMATTERS[r["metric_id"]]
 
             with st.expander(
                 f"**{r['name']}** — {quartile_label}  |  Score: {r['score']:.0f}/100",
@@ -77,10 +53,10 @@ def show():
             ):
                 # Metric overview
                 col1, col2, col3, col4 = st.columns(4)
-                col1.metric("Your Value", format_value(r["value"], r["unit"], r["format"]))
-                col2.metric("Industry Median", format_value(r["median"], r["unit"], r["format"]))
-                col3.metric("Top Quartile", format_value(r["top_quartile"], r["unit"], r["format"]))
-                col4.metric("Bottom Quartile", format_value(r["bottom_quartile"], r["unit"], r["format"]))
+                col1.metric("Your Value", fmt(r["value"]))
+                col2.metric("Industry Median", fmt(r["median"]))
+                col3.metric("Top Quartile", fmt(r["top_quartile"]))
+                col4.metric("Bottom Quartile", fmt(r["bottom_quartile"]))
 
                 # Position bar chart
                 chart = create_metric_bar_chart(r)
@@ -97,9 +73,7 @@ def show():
                 st.markdown(f"**Analysis:** {r['insight']}")
 
                 # What this metric means
-                bench = benchmarks.get(r["metric_id"], {})
-                if "description" in bench:
-                    st.caption(f"*{bench['description']}*")
+                st.caption(f"*{bench.description}*")
                 st.caption(f"Source: {r['source']}")
 
         st.divider()